@@ -0,0 +1,85 @@
+"""Kokoro model loading helpers shared by both Kokoro TTS services.
+
+Depends only on NumPy, onnxruntime and kokoro-onnx.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import onnxruntime as ort
+from kokoro_onnx import Kokoro
+
+# cuDNN's EXHAUSTIVE search benchmarks every conv algorithm again for each new
+# input shape, and Kokoro's shapes change with every utterance length, so the
+# search would keep landing on live requests.  HEURISTIC picks an algorithm
+# from cuDNN's heuristics without benchmarking.
+CUDA_PROVIDER = ("CUDAExecutionProvider", {"cudnn_conv_algo_search": "HEURISTIC"})
+
+
+def fp16_variant(model_path: str) -> str:
+    """Return the FP16 export next to *model_path* if there is one.
+
+    kokoro-onnx publishes ``kokoro-v1.0.fp16.onnx`` alongside the FP32 model;
+    its inputs and outputs stay FP32, so it is a drop-in on the GPU where the
+    conv-heavy decoder runs roughly twice as fast in half precision.
+    """
+    path = Path(model_path)
+    if path.suffixes[-2:] == [".fp16", ".onnx"]:
+        return model_path
+    fp16_path = path.with_name(f"{path.stem}.fp16{path.suffix}")
+    return str(fp16_path) if fp16_path.exists() else model_path
+
+
+def session_options() -> ort.SessionOptions:
+    """Session options for the Kokoro graph.
+
+    Full graph optimisation is pinned explicitly rather than relying on the
+    build's default, so conv/attention fusions are always applied.
+    """
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.enable_mem_pattern = True
+    so.enable_cpu_mem_arena = True
+    return so
+
+
+def load_kokoro(
+    model_path: str,
+    voices_path: str,
+    providers: List[Union[str, Tuple[str, dict]]],
+    sess_options: ort.SessionOptions,
+) -> Kokoro:
+    """Load Kokoro on *providers* with *sess_options*.
+
+    Only builds our own session when Kokoro can adopt it; otherwise the model
+    would be parsed and allocated twice.  Older kokoro-onnx versions without
+    ``from_session`` build their own session and ignore *sess_options*.
+    """
+    if hasattr(Kokoro, "from_session"):
+        sess = ort.InferenceSession(model_path, sess_options=sess_options, providers=providers)
+        return Kokoro.from_session(sess, voices_path)
+    if providers != ["CPUExecutionProvider"]:
+        return Kokoro(model_path, voices_path, providers=providers)
+    return Kokoro(model_path, voices_path)
+
+
+class VoiceStyleCache:
+    """Decoded voice styles of a Kokoro instance, keyed by voice id.
+
+    kokoro-onnx reads voices lazily from the ``.npz`` voices file, so passing
+    a voice name to ``create_stream`` re-reads the entry from the archive on
+    every utterance.  Entries are keyed by id, so switching voices just
+    selects (or fills) a different one.
+    """
+
+    def __init__(self, kokoro) -> None:
+        self._kokoro = kokoro
+        self._styles: Dict[str, np.ndarray] = {}
+
+    def get(self, voice_id: str) -> np.ndarray:
+        """Return the style array for *voice_id*, decoding it only once."""
+        style = self._styles.get(voice_id)
+        if style is None:
+            style = self._styles[voice_id] = self._kokoro.get_voice_style(voice_id)
+        return style
@@ -0,0 +1,88 @@
+"""float32 → 16-bit PCM conversion shared by the Kokoro TTS services.
+
+Kokoro yields float32 samples in [-1, 1]; the pipeline wants signed 16-bit
+little-endian PCM.  With numba installed the conversion is a single fused
+scale/saturate/narrow loop that LLVM vectorises; without it we fall back to
+three NumPy passes over a reused float32 scratch buffer.  Depends only on
+NumPy (numba optional).
+"""
+
+import numpy as np
+
+_UNSET = object()
+_kernel = _UNSET
+
+
+def _load_kernel():
+    """Return the numba kernel, or ``None`` without numba.
+
+    Importing numba and compiling costs most of a second and >100 MB, so it is
+    done on first use rather than at import: the main server imports this
+    package but never converts audio.
+    """
+    global _kernel
+    if _kernel is not _UNSET:
+        return _kernel
+    try:
+        from numba import njit, types
+    except ImportError:
+        _kernel = None
+        return None
+
+    # Compiled eagerly for the one signature we use, so the first chunk of the
+    # first utterance doesn't pay for JIT compilation.  The source is declared
+    # read-only so that, like the NumPy path, it also accepts arrays that
+    # aren't writeable (writeable ones still match).
+    @njit(
+        types.void(
+            types.Array(types.float32, 1, "A", readonly=True),
+            types.Array(types.int16, 1, "C"),
+        ),
+        cache=True,
+        fastmath=True,
+        boundscheck=False,
+    )
+    def _f32_to_s16(src, dst):
+        for i in range(src.shape[0]):
+            v = src[i] * np.float32(32767.0)
+            if v > 32767.0:
+                v = np.float32(32767.0)
+            elif v < -32768.0:
+                v = np.float32(-32768.0)
+            dst[i] = np.int16(v)
+
+    _kernel = _f32_to_s16
+    return _f32_to_s16
+
+
+class PCM16Converter:
+    """Convert float32 chunks to int16 PCM into buffers reused across calls.
+
+    The returned array is a view of the internal buffer and is only valid
+    until the next :meth:`convert` call; copy it (e.g. ``tobytes()``) if it
+    must outlive that.
+    """
+
+    def __init__(self) -> None:
+        self._kernel = _load_kernel()
+        self._f32 = np.empty(0, dtype=np.float32)
+        self._i16 = np.empty(0, dtype=np.int16)
+
+    def convert(self, samples: np.ndarray) -> np.ndarray:
+        """Return *samples* scaled and saturated to int16."""
+        samples = np.asarray(samples, dtype=np.float32)
+        n = samples.shape[0]
+        if self._i16.shape[0] < n:
+            self._i16 = np.empty(n, dtype=np.int16)
+            if self._kernel is None:
+                self._f32 = np.empty(n, dtype=np.float32)
+
+        out = self._i16[:n]
+        if self._kernel is not None:
+            self._kernel(samples, out)
+        else:
+            scaled = self._f32[:n]
+            np.multiply(samples, 32767, out=scaled)
+            np.clip(scaled, -32768, 32767, out=scaled)
+            np.copyto(out, scaled, casting="unsafe")
+        return out
@@ -0,0 +1,33 @@
+"""Binary framing for the Kokoro subprocess's stdout.
+
+Every message is a 5-byte header – a 1-byte tag and a 4-byte big-endian
+payload length – followed by the payload.  Audio goes over the pipe as raw
+16-bit little-endian PCM, so there is no base64/JSON work per chunk and no
+line-length limit on the reader.  Stdlib-only.
+"""
+
+import struct
+
+HEADER = struct.Struct(">BI")
+
+# Payload: none.
+MSG_STARTED = 1
+# Payload: sample rate of the audio that follows, as a big-endian uint32.
+MSG_FORMAT = 2
+# Payload: raw PCM (int16 little-endian, mono).
+MSG_AUDIO = 3
+# Payload: none.
+MSG_STOPPED = 4
+# Payload: UTF-8 error message.
+MSG_ERROR = 5
+# Payload: none.  Marks the end of the response to one request.
+MSG_EOF = 6
+
+MSG_TAGS = frozenset((MSG_STARTED, MSG_FORMAT, MSG_AUDIO, MSG_STOPPED, MSG_ERROR, MSG_EOF))
+
+# Upper bound on a payload.  One Kokoro chunk is at most ~30 s of 24 kHz
+# audio (~1.5 MB); anything far larger means the header is garbage, and
+# reading it would block the parent on bytes that never come.
+MAX_PAYLOAD = 16 << 20
+
+SAMPLE_RATE = struct.Struct(">I")
@@ -7,9 +7,9 @@
 
 import base64
 import json
+import threading
 import uuid
-import numpy as np
-from typing import AsyncGenerator, List, Optional, Union
+from typing import AsyncGenerator, Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 from pydantic import BaseModel
@@ -36,9 +36,49 @@ except ModuleNotFoundError as e:
 
 import onnxruntime as ort
 
-privders = ort.get_available_providers()
-logger.info("Available providers:", privders)  # Make sure CUDAExecutionProvider is listed
-logger.info(f'Is CUDA available: {"CUDAExecutionProvider" in privders}')
+from ._model import CUDA_PROVIDER, VoiceStyleCache, fp16_variant, load_kokoro, session_options
+from ._pcm import PCM16Converter
+
+# Probed once per process rather than on every service construction.
+_AVAILABLE_PROVIDERS = tuple(ort.get_available_providers())
+_USE_CUDA = "CUDAExecutionProvider" in _AVAILABLE_PROVIDERS
+logger.info(f"Available providers: {_AVAILABLE_PROVIDERS}")  # Make sure CUDAExecutionProvider is listed
+logger.info(f"Is CUDA available: {_USE_CUDA}")
+
+# Kokoro models shared by every KokoroTTSService in the process, keyed by
+# (model_path, voices_path).  Loading takes seconds and each copy holds its
+# own ONNX Runtime session and GPU memory, so sessions reuse one instance.
+_KOKORO_CACHE: Dict[Tuple[str, str], Kokoro] = {}
+_KOKORO_CACHE_LOCK = threading.Lock()
+
+
+def _create_kokoro(model_path: str, voices_path: str) -> Kokoro:
+    """Load Kokoro, on CUDA if available, else CPU."""
+    if _USE_CUDA:
+        model_path = fp16_variant(model_path)
+        logger.info(f"Loading Kokoro model on CUDA: {model_path}")
+        providers = [CUDA_PROVIDER, "CPUExecutionProvider"]
+    else:
+        providers = ["CPUExecutionProvider"]
+    return load_kokoro(model_path, voices_path, providers, session_options())
+
+
+def _load_kokoro(model_path: str, voices_path: str) -> Kokoro:
+    """Return the process-wide Kokoro instance for the given model files."""
+    key = (str(model_path), str(voices_path))
+    with _KOKORO_CACHE_LOCK:
+        kokoro = _KOKORO_CACHE.get(key)
+        if kokoro is None:
+            kokoro = _KOKORO_CACHE[key] = _create_kokoro(model_path, voices_path)
+            logger.info("Kokoro initialized")
+        else:
+            logger.info("Reusing loaded Kokoro model")
+        return kokoro
+
+
+# Kokoro stream chunks shorter than this are coalesced into a single
+# TTSAudioRawFrame so tiny chunks don't each pay the per-frame pipeline cost.
+MIN_FRAME_MS = 20
 
 def language_to_kokoro_language(language: Language) -> Optional[str]:
     """Convert pipecat Language to Kokoro language code."""
@@ -94,25 +134,7 @@ class KokoroTTSService(TTSService):
         """
         super().__init__(sample_rate=sample_rate, **kwargs)
         logger.info(f"Initializing Kokoro TTS service with model_path: {model_path} and voices_path: {voices_path}")
-        providers = ort.get_available_providers()
-        use_cuda  = "CUDAExecutionProvider" in providers
-
-        if use_cuda:
-            sess = ort.InferenceSession(model_path,
-                                        providers=[("CUDAExecutionProvider",
-                                                    {"cudnn_conv_algo_search":"EXHAUSTIVE"}),
-                                                "CPUExecutionProvider"])
-            # older kokoro versions
-            if hasattr(Kokoro, "from_session"):
-                self._kokoro = Kokoro.from_session(sess, voices_path)
-            else:                                  # ≥ 0.9.x
-                self._kokoro = Kokoro(model_path, voices_path,
-                                    providers=[("CUDAExecutionProvider",
-                                                {"cudnn_conv_algo_search":"EXHAUSTIVE"}),
-                                                "CPUExecutionProvider"])
-        else:
-            self._kokoro = Kokoro(model_path, voices_path)
-        logger.info(f"Kokoro initialized")
+        self._kokoro = _load_kokoro(model_path, voices_path)
         self._settings = {
             "language": self.language_to_service_language(params.language)
             if params.language
@@ -120,6 +142,8 @@ class KokoroTTSService(TTSService):
             "speed": params.speed,
         }
         self.set_voice(voice_id)  # Presumably this sets self._voice_id
+        self._pcm = PCM16Converter()
+        self._voice_styles = VoiceStyleCache(self._kokoro)
 
         logger.info("Kokoro TTS service initialized")
 
@@ -139,17 +163,17 @@ class KokoroTTSService(TTSService):
         Yields:
             Frames containing audio data and status information.
         """
-        logger.debug(f"Generating TTS: [{text}]")
+        logger.debug("Generating TTS: [{}]", text)
         try:
             await self.start_ttfb_metrics()
             yield TTSStartedFrame()
 
             # Use Kokoro's streaming mode. The create_stream method is assumed to return
             # an async generator that yields (samples, sample_rate) tuples, where samples is a numpy array.
-            logger.info(f"Creating stream")
+            logger.debug("Creating stream")
             stream = self._kokoro.create_stream(
                 text,
-                voice=self._voice_id,
+                voice=self._voice_styles.get(self._voice_id),
                 speed=self._settings["speed"],
                 lang=self._settings["language"],
             )
@@ -157,14 +181,32 @@ class KokoroTTSService(TTSService):
 
             await self.start_tts_usage_metrics(text)
             started = False
+            pending: List[bytes] = []
+            pending_bytes = 0
             async for samples, sample_rate in stream:
                 if not started:
                     started = True
-                    logger.info(f"Started streaming")
-                # Convert the float32 samples (assumed in the range [-1, 1]) to int16 PCM format
-                samples_int16 = (samples * 32767).astype(np.int16)
+                    logger.debug("Started streaming")
+                # Convert the float32 samples (nominally in [-1, 1]) to int16 PCM.
+                # Kokoro can overshoot slightly, so saturate before the cast
+                # instead of letting out-of-range samples wrap around.
+                samples_int16 = self._pcm.convert(samples)
+                # Frames are queued downstream, so each one needs its own copy
+                # of the audio; tobytes() on the contiguous scratch is that copy.
+                pending.append(samples_int16.tobytes())
+                pending_bytes += samples_int16.nbytes
+                if pending_bytes * 1000 >= sample_rate * 2 * MIN_FRAME_MS:
+                    yield TTSAudioRawFrame(
+                        audio=b"".join(pending),
+                        sample_rate=sample_rate,
+                        num_channels=1,
+                    )
+                    pending.clear()
+                    pending_bytes = 0
+
+            if pending:
                 yield TTSAudioRawFrame(
-                    audio=samples_int16.tobytes(),
+                    audio=b"".join(pending),
                     sample_rate=sample_rate,
                     num_channels=1,
                 )
@@ -172,5 +214,5 @@ class KokoroTTSService(TTSService):
             yield TTSStoppedFrame()
 
         except Exception as e:
-            logger.error(f"{self} exception: {e}")
+            logger.error("{} exception: {}", self, e)
             yield ErrorFrame(f"Error generating audio: {str(e)}")
\ No newline at end of file
@@ -7,30 +7,27 @@ It loads the Kokoro ONNX model (and, by extension, heavy CUDA / onnxruntime-gpu
 libraries) in *its own* Python interpreter / virtual-environment so that those
 DLL/SO dependencies never clash with the main process.
 
-The protocol is newline-delimited JSON (a.k.a. *jsonl*):
+The parent sends one JSON object per line of **UTF-8** text on *stdin*::
 
-1. The parent process sends a single JSON object per line of **UTF-8** text on
-   *stdin* with the following shape::
+    {"text": "Hello world", "voice_id": "af_sarah", "language": "en-us", "speed": 1.0}
 
-       {"text": "Hello world", "voice_id": "af_sarah", "language": "en-us", "speed": 1.0}
+Only the ``text`` key is mandatory – the other keys fall back to the values
+originally supplied on the command-line.  A request with ``"warmup": true`` is
+synthesised but produces no audio, only the final ``EOF``.
 
-   Only the ``text`` key is mandatory – the other keys fall back to the values
-   originally supplied on the command-line.
+Responses on *stdout* are binary frames (see ``_protocol.py``): a 1-byte tag,
+a 4-byte big-endian length and the payload.  Each request produces::
 
-2. For every request the server writes a series of JSON objects to *stdout*
-   (each terminated by a ``\n``)::
+    STARTED
+    FORMAT (sample rate, before the first audio and whenever it changes)
+    AUDIO  (raw int16 PCM) ... 0-n more ...
+    STOPPED
+    EOF
 
-       {"type": "started"}
-       {"type": "audio_chunk", "sample_rate": 24000, "data": "<base64 pcm>"}
-       ... (0-n more "audio_chunk" messages) ...
-       {"type": "stopped"}
-       {"type": "eof"}
-
-   The parent treats them as a *stream* and converts them into Pipecat frames.
-
-Errors are returned as::
-
-       {"type": "error", "message": "<description>"}
+or an ``ERROR`` frame carrying a UTF-8 message in place of ``STOPPED``.
+Nothing else may be written to stdout, so before importing its dependencies
+the script points fd 1 at stderr and keeps a private handle to the real
+stdout for frames.
 
 One request is processed at a time.  Parallelism is left to the parent process
 (which can spin up several subprocesses if required).
@@ -40,24 +37,55 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import base64
 import json
+import os
 import sys
-from typing import Optional
-
-import numpy as np
-from loguru import logger
+from typing import List, Optional, Union
+
+# Claim the real stdout for protocol frames before importing anything that
+# might print: a stray write on fd 1 would corrupt the binary stream.  fd 1 is
+# pointed at stderr and frames go to this duplicate of the original.
+_OUT_FD = os.dup(sys.stdout.fileno())
+os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+from loguru import logger  # noqa: E402
+
+# Run as a script, so this directory (not the package) is on sys.path.  The
+# sibling modules imported this way (_protocol, _model, _pcm) are shared with
+# the in-process service, so they must only depend on packages installed in
+# the TTS virtual-env as well, and use no relative imports.
+from _protocol import (  # noqa: E402
+    HEADER,
+    MSG_AUDIO,
+    MSG_EOF,
+    MSG_ERROR,
+    MSG_FORMAT,
+    MSG_STARTED,
+    MSG_STOPPED,
+    SAMPLE_RATE,
+)
 
 # kokoro-onnx and onnxruntime-gpu live **in this environment** so importing them
-# here is safe and isolated from the parent interpreter.
+# here is safe and isolated from the parent interpreter.  _model uses it; the
+# import is checked here so a missing package is reported over the protocol.
 try:
-    from kokoro_onnx import Kokoro  # type: ignore
+    import kokoro_onnx  # type: ignore  # noqa: F401
 except ModuleNotFoundError as e:
-    print(json.dumps({"type": "error", "message": f"Missing dependency: {e}"}), flush=True)
+    message = f"Missing dependency: {e}".encode()
+    os.write(_OUT_FD, HEADER.pack(MSG_ERROR, len(message)) + message)
     sys.exit(1)
 
 import onnxruntime as ort  # noqa: E402
 
+from _model import (  # noqa: E402
+    CUDA_PROVIDER,
+    VoiceStyleCache,
+    fp16_variant,
+    load_kokoro,
+    session_options,
+)
+from _pcm import PCM16Converter  # noqa: E402
+
 
 def parse_args() -> argparse.Namespace:  # pragma: no cover
     parser = argparse.ArgumentParser(description="Run Kokoro TTS as a subprocess server")
@@ -67,6 +95,12 @@ def parse_args() -> argparse.Namespace:  # pragma: no cover
     parser.add_argument("--language", default="en-us", help="Language code (e.g., en-us)")
     parser.add_argument("--speed", type=float, default=1.0, help="Base speaking speed (1.0 = normal)")
     parser.add_argument("--sample-rate", type=int, default=None, help="Force output sample-rate")
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        default=None,
+        help="ONNX Runtime intra-op threads when running on CPU (default: min(4, CPU count))",
+    )
     parser.add_argument("--debug", action="store_true", help="Enable verbose logging on stderr")
     return parser.parse_args()
 
@@ -81,44 +115,46 @@ class KokoroServer:
         language: str = "en-us",
         speed: float = 1.0,
         sample_rate: Optional[int] = None,
+        cpu_threads: Optional[int] = None,
+        out_fd: Optional[int] = None,
     ) -> None:
         # Initialise Kokoro session – CUDA if available, else CPU.
         providers = ort.get_available_providers()
         use_cuda = "CUDAExecutionProvider" in providers
 
+        so = session_options()
+
         if use_cuda:
-            sess = ort.InferenceSession(
+            model_path = fp16_variant(model_path)
+            logger.info("Loading Kokoro model on CUDA: {}", model_path)
+            session_providers = [CUDA_PROVIDER, "CPUExecutionProvider"]
+        else:
+            # ORT defaults to one intra-op thread per core, which competes with
+            # the parent pipeline (Whisper, VAD, the event loop) for the CPU.
+            so.intra_op_num_threads = cpu_threads or min(4, os.cpu_count() or 1)
+            so.inter_op_num_threads = 1
+            so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            logger.info(
+                "Loading Kokoro model on CPU with {} threads: {}",
+                so.intra_op_num_threads,
                 model_path,
-                providers=[
-                    (
-                        "CUDAExecutionProvider",
-                        {"cudnn_conv_algo_search": "EXHAUSTIVE"},
-                    ),
-                    "CPUExecutionProvider",
-                ],
             )
-            if hasattr(Kokoro, "from_session"):
-                self._kokoro = Kokoro.from_session(sess, voices_path)
-            else:
-                self._kokoro = Kokoro(
-                    model_path,
-                    voices_path,
-                    providers=[
-                        (
-                            "CUDAExecutionProvider",
-                            {"cudnn_conv_algo_search": "EXHAUSTIVE"},
-                        ),
-                        "CPUExecutionProvider",
-                    ],
-                )
-        else:
-            self._kokoro = Kokoro(model_path, voices_path)
+            session_providers = ["CPUExecutionProvider"]
+
+        self._kokoro = load_kokoro(model_path, voices_path, session_providers, so)
 
         self._voice_id = voice_id
         self._language = language
         self._speed = speed
         self._sample_rate = sample_rate
 
+        # Reused across chunks so PCM conversion doesn't allocate per chunk.
+        self._pcm = PCM16Converter()
+        self._out_fd = out_fd if out_fd is not None else _OUT_FD
+        # Buffers written but not yet flushed to the parent; see _send_frame().
+        self._pending: List[Union[bytes, memoryview]] = []
+        self._voice_styles = VoiceStyleCache(self._kokoro)
+
     async def run_forever(self) -> None:  # pragma: no cover
         """Process stdin forever until EOF."""
 
@@ -140,30 +176,79 @@ class KokoroServer:
             try:
                 request = json.loads(line.decode())
             except json.JSONDecodeError:
-                self._send_json({"type": "error", "message": "Invalid JSON"})
+                self._send_error("Invalid JSON")
                 continue
 
             text = request.get("text")
             if not text:
-                self._send_json({"type": "error", "message": "Request missing 'text' field"})
+                self._send_error("Request missing 'text' field")
                 continue
 
             voice_id = request.get("voice_id", self._voice_id)
             language = request.get("language", self._language)
             speed = float(request.get("speed", self._speed))
 
-            await self._process_text(text, voice_id, language, speed)
+            if request.get("warmup"):
+                await self._warm_up(text, voice_id, language, speed)
+            else:
+                await self._process_text(text, voice_id, language, speed)
 
             # Signal request finished.  Having an explicit sentinel makes life
             # easier for the parent side – especially if we ever decide to
             # support persistent connections processing multiple requests
             # concurrently.
-            self._send_json({"type": "eof"})
-
-    def _send_json(self, payload: dict) -> None:
-        """Serialize *payload* and write it to stdout followed by a newline."""
-        sys.stdout.write(json.dumps(payload, separators=(",", ":")) + "\n")
-        sys.stdout.flush()
+            self._send_frame(MSG_EOF)
+
+    def _send_frame(self, tag: int, payload: Union[bytes, memoryview] = b"", *, flush: bool = True) -> None:
+        """Write one frame to the parent.
+
+        Frames the parent doesn't need immediately are sent with
+        ``flush=False`` so they share a pipe write (and a parent wakeup) with
+        the next flushed frame.  *payload* is referenced, not copied, until
+        the flush, so a view of a reused buffer must be sent with a flush.
+        """
+        self._pending.append(HEADER.pack(tag, len(payload)))
+        if payload:
+            self._pending.append(payload)
+        if flush:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write every pending buffer with one ``writev`` (barring short writes)."""
+        pending = self._pending
+        while pending:
+            written = os.writev(self._out_fd, pending)
+            while written:
+                head = pending[0]
+                if written >= len(head):
+                    written -= len(head)
+                    del pending[0]
+                else:
+                    pending[0] = memoryview(head)[written:]
+                    written = 0
+
+    def _send_error(self, message: str) -> None:
+        self._send_frame(MSG_ERROR, message.encode())
+
+    async def _warm_up(self, text: str, voice_id: str, language: str, speed: float) -> None:
+        """Synthesise *text* without sending any audio.
+
+        The first inference pays for CUDA context creation and kernel
+        loading; the parent sends this right after start-up so that cost
+        lands before the user's first utterance.
+        """
+        try:
+            stream = self._kokoro.create_stream(
+                text,
+                voice=self._voice_styles.get(voice_id),
+                speed=speed,
+                lang=language,
+            )
+            async for _ in stream:
+                pass
+        except Exception as e:  # pragma: no cover
+            logger.exception("Error during warm-up")
+            self._send_error(str(e))
 
     async def _process_text(
         self,
@@ -174,39 +259,36 @@ class KokoroServer:
     ) -> None:
         """Generate speech for *text* and emit streaming chunks."""
         try:
-            self._send_json({"type": "started"})
+            # The parent emits its own TTSStartedFrame on request, so this
+            # only needs to arrive with the first audio.
+            self._send_frame(MSG_STARTED, flush=False)
 
             stream = self._kokoro.create_stream(
                 text,
-                voice=voice_id,
+                voice=self._voice_styles.get(voice_id),
                 speed=speed,
                 lang=language,
             )
 
-            MAX_RAW_BYTES = 16 * 1024  # 16 KB raw PCM ⇒ ~22 KB base64, < 64 KB limit
-
+            sent_rate: Optional[int] = None
             async for samples, sample_rate in stream:
-                # Convert to 16-bit PCM little-endian
-                samples_int16 = (samples * 32767).astype(np.int16)
-                raw = samples_int16.tobytes()
-
-                # Split into manageable chunks so that the encoded line length
-                # never exceeds asyncio.StreamReader's default 64 KB limit.
-                for offset in range(0, len(raw), MAX_RAW_BYTES):
-                    sub = raw[offset : offset + MAX_RAW_BYTES]
-                    chunk_b64 = base64.b64encode(sub).decode()
-                    self._send_json(
-                        {
-                            "type": "audio_chunk",
-                            "sample_rate": sample_rate,
-                            "data": chunk_b64,
-                        }
-                    )
-
-            self._send_json({"type": "stopped"})
+                if sample_rate != sent_rate:
+                    self._send_frame(MSG_FORMAT, SAMPLE_RATE.pack(sample_rate), flush=False)
+                    sent_rate = sample_rate
+
+                # Convert to 16-bit PCM little-endian, saturating instead of
+                # wrapping if Kokoro overshoots [-1, 1].
+                samples_int16 = self._pcm.convert(samples)
+
+                # The conversion buffer isn't reused until the next chunk, so
+                # it is written out in place rather than copied to bytes first.
+                self._send_frame(MSG_AUDIO, memoryview(samples_int16).cast("B"))
+
+            # Flushed together with the EOF that always follows.
+            self._send_frame(MSG_STOPPED, flush=False)
         except Exception as e:  # pragma: no cover
             logger.exception("Error generating TTS")
-            self._send_json({"type": "error", "message": str(e)})
+            self._send_error(str(e))
 
 
 def entrypoint() -> None:  # pragma: no cover
@@ -225,9 +307,17 @@ def entrypoint() -> None:  # pragma: no cover
         language=args.language,
         speed=args.speed,
         sample_rate=args.sample_rate,
+        cpu_threads=args.cpu_threads,
     )
 
-    asyncio.run(server.run_forever())
+    # Same event loop choice as the main server: uvloop when it is installed
+    # in the TTS venv, the default loop otherwise.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(server.run_forever())
+    else:
+        uvloop.run(server.run_forever())
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,31 +1,73 @@
 import asyncio
-import base64
 import json
 import os
-import sys
+from collections import deque
+from contextlib import suppress
 from pathlib import Path
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, Deque, List, Optional, Tuple
 
 from loguru import logger
 from pydantic import BaseModel
 
 from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
     ErrorFrame,
     Frame,
+    StartFrame,
     TTSAudioRawFrame,
     TTSStartedFrame,
     TTSStoppedFrame,
 )
 from pipecat.services.tts_service import TTSService
 
+from ._protocol import (
+    HEADER,
+    MAX_PAYLOAD,
+    MSG_AUDIO,
+    MSG_EOF,
+    MSG_ERROR,
+    MSG_FORMAT,
+    MSG_STARTED,
+    MSG_STOPPED,
+    MSG_TAGS,
+    SAMPLE_RATE,
+)
+
+# Short enough to synthesise quickly, long enough to exercise the decoder.
+_WARMUP_TEXT = "Hello there."
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one ``(tag, payload)`` frame from the subprocess's stdout.
+
+    The header is validated before the payload is read: frames can't be
+    resynchronised after garbage, so a bad one raises and the caller restarts
+    the subprocess.
+    """
+    tag, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if tag not in MSG_TAGS or length > MAX_PAYLOAD:
+        raise RuntimeError(f"Corrupt frame from TTS subprocess (tag {tag}, length {length})")
+    payload = await reader.readexactly(length) if length else b""
+    return tag, payload
+
+
+# Buffer limit for the subprocess's stdout.  One AUDIO frame holds a whole
+# Kokoro chunk (a sentence is easily 100-300 KB of PCM); with asyncio's 64 KB
+# default the pipe transport pauses and resumes several times per frame.
+_READ_LIMIT = 1 << 20
+
+# Lines of subprocess stderr kept for logging when it dies unexpectedly.
+_STDERR_TAIL_LINES = 50
+
 
 class KokoroSubprocessTTSService(TTSService):
     """Run Kokoro TTS inside an *external* Python interpreter.
 
     Heavy dependencies such as *onnxruntime-gpu* live in a dedicated virtual
     environment referenced by *python_path*.  We launch
-    ``tts_subprocess_server.py`` in that environment and communicate with it via
-    a newline-delimited JSON protocol.
+    ``tts_subprocess_server.py`` in that environment, send it newline-delimited
+    JSON requests and read back length-prefixed binary frames of raw PCM.
     """
 
     class InputParams(BaseModel):
@@ -36,6 +78,7 @@ class KokoroSubprocessTTSService(TTSService):
         language: str = "en-us"
         speed: float = 1.0
         sample_rate: Optional[int] = None
+        cpu_threads: Optional[int] = None  # ORT threads if the subprocess falls back to CPU
         debug: bool = False
 
     def __init__(self, params: "KokoroSubprocessTTSService.InputParams", **kwargs):
@@ -45,6 +88,10 @@ class KokoroSubprocessTTSService(TTSService):
         self._reader: Optional[asyncio.StreamReader] = None
         self._writer: Optional[asyncio.StreamWriter] = None
         self._start_lock = asyncio.Lock()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: Deque[bytes] = deque(maxlen=_STDERR_TAIL_LINES)
 
     # ---------------------------------------------------------------------
     #   public helpers
@@ -52,6 +99,21 @@ class KokoroSubprocessTTSService(TTSService):
     def can_generate_metrics(self) -> bool:  # noqa: D401 – Pipecat signature
         return True
 
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        self._stopping = False
+        # Load the model while the user is still speaking their first turn
+        # instead of on the first run_tts() call.
+        self._schedule_warm_up()
+
+    async def stop(self, frame: EndFrame):
+        await super().stop(frame)
+        await self._shutdown()
+
+    async def cancel(self, frame: CancelFrame):
+        await super().cancel(frame)
+        await self._shutdown()
+
     async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:  # noqa: D401
         """Generate TTS frames for *text* using the subprocess."""
         try:
@@ -75,48 +137,41 @@ class KokoroSubprocessTTSService(TTSService):
 
             yield TTSStartedFrame()
 
-            # process responses until "eof"
+            # process frames until EOF
+            sample_rate = self.sample_rate
             while True:
-                line = await self._reader.readline()
-                if not line:
+                try:
+                    tag, payload = await _read_frame(self._reader)
+                except asyncio.IncompleteReadError:
+                    await self._log_stderr_tail()
                     yield ErrorFrame("TTS subprocess terminated unexpectedly")
                     break
 
-                try:
-                    msg = json.loads(line.decode())
-                except json.JSONDecodeError:
-                    logger.warning(f"Subprocess sent invalid JSON: {line[:100]}…")
-                    continue
-
-                mtype = msg.get("type")
-
-                if mtype == "audio_chunk":
-                    try:
-                        raw = base64.b64decode(msg["data"])
-                        sample_rate = int(msg["sample_rate"])
-                    except Exception as e:
-                        logger.warning(f"Malformed audio_chunk from subprocess: {e}")
-                        continue
-                    yield TTSAudioRawFrame(audio=raw, sample_rate=sample_rate, num_channels=1)
-                elif mtype == "started":
+                if tag == MSG_AUDIO:
+                    yield TTSAudioRawFrame(audio=payload, sample_rate=sample_rate, num_channels=1)
+                elif tag == MSG_FORMAT:
+                    (sample_rate,) = SAMPLE_RATE.unpack(payload)
+                elif tag == MSG_STARTED:
                     # already emitted a TTSStartedFrame; ignore
                     pass
-                elif mtype == "stopped":
+                elif tag == MSG_STOPPED:
                     yield TTSStoppedFrame()
-                elif mtype == "error":
-                    yield ErrorFrame(msg.get("message", "Unknown error"))
-                elif mtype == "eof":
+                elif tag == MSG_ERROR:
+                    yield ErrorFrame(payload.decode(errors="replace") or "Unknown error")
+                elif tag == MSG_EOF:
                     # request complete
                     break
-                # else: ignore unknown
 
         except asyncio.CancelledError:
             # Interruption: tear down the subprocess quickly and propagate the cancellation.
             await self._terminate_subprocess()
+            # Respawn it in the background while the user is speaking, so the
+            # reply after a barge-in doesn't pay for model load and warm-up.
+            self._schedule_warm_up()
             raise
 
         except Exception as e:
-            logger.error(f"Error in run_tts: {e}")
+            logger.error("Error in run_tts: {}", e)
             yield ErrorFrame(str(e))
             await self._terminate_subprocess()
 
@@ -125,7 +180,13 @@ class KokoroSubprocessTTSService(TTSService):
     # ------------------------------------------------------------------
     # internal helpers
     # ------------------------------------------------------------------
-    async def _start_subprocess(self) -> None:
+    async def _start_subprocess(self, warm_up: bool = False) -> None:
+        """Start the subprocess if it isn't running.
+
+        *warm_up* runs a throw-away request before the process is published;
+        only background starts ask for it, so a start on demand from
+        run_tts() never puts that synthesis in front of a real reply.
+        """
         if self._process and self._process.returncode is None:
             return  # already running
 
@@ -152,6 +213,8 @@ class KokoroSubprocessTTSService(TTSService):
             ]
             if self._params.sample_rate:
                 cmd.extend(["--sample-rate", str(self._params.sample_rate)])
+            if self._params.cpu_threads:
+                cmd.extend(["--cpu-threads", str(self._params.cpu_threads)])
             if self._params.debug:
                 cmd.append("--debug")
 
@@ -160,19 +223,103 @@ class KokoroSubprocessTTSService(TTSService):
 
             logger.info(f"Starting Kokoro TTS subprocess: {' '.join(cmd)}")
 
-            self._process = await asyncio.create_subprocess_exec(
+            process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=sys.stderr if self._params.debug else asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
                 env=env,
+                limit=_READ_LIMIT,
             )
 
+            # Drained by a task rather than inherited, so a slow terminal can
+            # never block the subprocess and a crash's traceback isn't lost.
+            self._stderr_tail.clear()
+            self._stderr_task = self.create_task(self._drain_stderr(process.stderr))
+
+            # Only publish the process once it is warm, so run_tts() waits on
+            # the lock above instead of queueing behind the warm-up request.
+            if warm_up:
+                try:
+                    await self._send_warmup(process.stdout, process.stdin)
+                except asyncio.IncompleteReadError as e:
+                    await self._log_stderr_tail()
+                    # Its stdout closed, so it is exiting or already gone;
+                    # make sure of it and reap it before giving up.
+                    if process.returncode is None:
+                        with suppress(ProcessLookupError):
+                            process.kill()
+                        await process.wait()
+                    raise RuntimeError("TTS subprocess terminated during warm-up") from e
+                except BaseException:
+                    process.kill()
+                    raise
+
             # The asyncio API already provides *StreamReader*/*StreamWriter* objects
             # attached to the subprocess via the ``stdout`` / ``stdin`` attributes.
             # Use them directly – no need for additional transport plumbing.
-            self._reader = self._process.stdout  # type: ignore[assignment]
-            self._writer = self._process.stdin  # type: ignore[assignment]
+            self._process = process
+            self._reader = process.stdout  # type: ignore[assignment]
+            self._writer = process.stdin  # type: ignore[assignment]
+
+    async def _send_warmup(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Run one throw-away request so CUDA/cuDNN setup happens before real traffic."""
+        request = {"text": _WARMUP_TEXT, "voice_id": self._params.voice_id, "warmup": True}
+        writer.write(json.dumps(request, separators=(",", ":")).encode() + b"\n")
+        await writer.drain()
+        while True:
+            tag, payload = await _read_frame(reader)
+            if tag == MSG_EOF:
+                return
+            if tag == MSG_ERROR:
+                raise RuntimeError(payload.decode(errors="replace"))
+
+    async def _drain_stderr(self, stream: asyncio.StreamReader) -> None:
+        """Keep the last lines of subprocess stderr; echo them in debug mode."""
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # A line longer than the reader limit.  readline() has already
+                # discarded it; keep reading, or the subprocess blocks once the
+                # pipe fills.
+                continue
+            if not line:  # EOF
+                return
+            self._stderr_tail.append(line)
+            if self._params.debug:
+                logger.debug("[kokoro] {}", line.decode(errors="replace").rstrip())
+
+    async def _log_stderr_tail(self) -> None:
+        # Both pipes close when the subprocess exits; give the drain task a
+        # moment to read the final lines (usually the traceback).
+        if self._stderr_task:
+            await asyncio.wait({self._stderr_task}, timeout=1)
+        if self._stderr_tail:
+            tail = b"".join(self._stderr_tail).decode(errors="replace").rstrip()
+            logger.error("Kokoro TTS subprocess stderr:\n{}", tail)
+
+    def _schedule_warm_up(self) -> None:
+        if self._stopping or (self._warmup_task and not self._warmup_task.done()):
+            return
+        self._warmup_task = self.create_task(self._warm_up())
+
+    async def _warm_up(self) -> None:
+        try:
+            await self._start_subprocess(warm_up=True)
+        except Exception as e:
+            # Not fatal: run_tts() starts the subprocess again and reports the error.
+            logger.warning("Kokoro TTS warm-up failed: {}", e)
+
+    async def _shutdown(self) -> None:
+        self._stopping = True
+        if self._warmup_task:
+            await self.cancel_task(self._warmup_task)
+            self._warmup_task = None
+        await self._terminate_subprocess()
+        if self._stderr_task:
+            await self.cancel_task(self._stderr_task)
+            self._stderr_task = None
 
     async def _terminate_subprocess(self) -> None:
         if self._process and self._process.returncode is None:
@@ -7,7 +7,6 @@ import asyncio
 import os
 import sys
 import logging
-import tracemalloc
 from contextlib import asynccontextmanager
 from typing import Any, Dict
 from pathlib import Path
@@ -15,9 +14,17 @@ from pathlib import Path
 import uvicorn
 from fastapi import FastAPI, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from dotenv import load_dotenv
 
-# Enable tracemalloc for debugging
-tracemalloc.start()
+# Load .env before reading DEBUG_TRACEMALLOC; the pipeline module loads it too,
+# but only once it is imported further down.
+load_dotenv(override=True)
+
+# tracemalloc hooks every allocation, so only enable it when debugging leaks
+if os.environ.get("DEBUG_TRACEMALLOC"):
+    import tracemalloc
+
+    tracemalloc.start()
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -104,7 +111,15 @@ async def main():
     
     logging.info(f"Starting voice pipeline server on {host}:{port}")
     
-    config = uvicorn.Config(app, host=host, port=port, log_level="info")
+    # PCM audio frames barely compress, so permessage-deflate only burns CPU
+    # on both ends of the socket for every frame.
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        log_level="info",
+        ws_per_message_deflate=False,
+    )
     server = uvicorn.Server(config)
     
     try:
@@ -114,4 +129,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop is a drop-in, faster event loop for the WebSocket audio path.
+    # It is not available on Windows, so fall back to the default loop.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file